@@ -1,94 +1,28 @@
 import sys
-import json
-import sqlite3
 from dataclasses import dataclass
-from pathlib import Path
 
-from PySide6.QtCore import Qt, QRectF, QPointF
+import numpy as np
+
+from PySide6.QtCore import Qt, QRectF, QPointF, QSize, QObject, QRunnable, QThreadPool, QTimer, Signal
 from PySide6.QtGui import (
-    QPainter, QPen, QBrush, QColor, QFont, QPixmap, QPainterPath
+    QPainter, QPen, QBrush, QColor, QFont, QPixmap, QPainterPath, QPixmapCache,
+    QImage, QImageReader, QPicture, QStaticText, QTransform, QSurfaceFormat
 )
+# диалоги выбора (QFileDialog, QColorDialog, QInputDialog) импортируются
+# в обработчиках: на старте они не нужны
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, QVBoxLayout,
-    QPushButton, QFileDialog, QGraphicsView, QGraphicsScene,
+    QPushButton, QGraphicsView, QGraphicsScene,
     QGraphicsItem, QTextEdit, QDialog, QDialogButtonBox, QLabel, QLineEdit,
-    QMessageBox, QColorDialog, QInputDialog, QGraphicsTextItem
+    QMessageBox, QGraphicsTextItem
 )
+from PySide6.QtOpenGLWidgets import QOpenGLWidget
+from shiboken6 import isValid
 
-# ----------------------------
-# DB
-# ----------------------------
-DB_PATH = Path(__file__).with_name("deathnote.db")
-
-
-def db_conn():
-    return sqlite3.connect(DB_PATH)
-
-
-def db_init():
-    with db_conn() as conn:
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS board_items (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            type TEXT NOT NULL,          -- 'card' | 'image' | 'text' | 'draw'
-            x REAL NOT NULL,
-            y REAL NOT NULL,
-            w REAL NOT NULL,
-            h REAL NOT NULL,
-            z INTEGER NOT NULL DEFAULT 0,
-            payload TEXT NOT NULL        -- JSON
-        )
-        """)
-
-
-def db_insert_item(item_type: str, x: float, y: float, w: float, h: float, payload: dict, z: int = 0) -> int:
-    with db_conn() as conn:
-        cur = conn.execute(
-            "INSERT INTO board_items(type, x, y, w, h, z, payload) VALUES(?, ?, ?, ?, ?, ?, ?)",
-            (item_type, x, y, w, h, z, json.dumps(payload, ensure_ascii=False)),
-        )
-        return int(cur.lastrowid)
-
-
-def db_update_geom(item_id: int, x: float, y: float, w: float, h: float):
-    with db_conn() as conn:
-        conn.execute(
-            "UPDATE board_items SET x=?, y=?, w=?, h=? WHERE id=?",
-            (float(x), float(y), float(w), float(h), int(item_id)),
-        )
-
-
-def db_update_payload(item_id: int, payload: dict):
-    with db_conn() as conn:
-        conn.execute(
-            "UPDATE board_items SET payload=? WHERE id=?",
-            (json.dumps(payload, ensure_ascii=False), int(item_id)),
-        )
-
-
-def db_delete(item_id: int):
-    with db_conn() as conn:
-        conn.execute("DELETE FROM board_items WHERE id=?", (int(item_id),))
-
-
-def db_load_all():
-    with db_conn() as conn:
-        rows = conn.execute("SELECT id, type, x, y, w, h, z, payload FROM board_items ORDER BY z, id").fetchall()
-    out = []
-    for r in rows:
-        out.append({
-            "id": int(r[0]),
-            "type": r[1],
-            "x": float(r[2]),
-            "y": float(r[3]),
-            "w": float(r[4]),
-            "h": float(r[5]),
-            "z": int(r[6]),
-            "payload": json.loads(r[7]) if r[7] else {},
-        })
-    return out
-
+from db import (
+    init_db, db_insert_item, db_insert_many, db_queue_geom, db_flush_geom,
+    db_update_payload, db_delete, db_load_all
+)
 
 # ----------------------------
 # Dialog: create card
@@ -114,8 +48,62 @@ class CardDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
+        self._data: tuple[str, str] | None = None
+
+    def accept(self):
+        # снимок полей один раз при OK: toPlainText() сериализует весь документ
+        self._data = (self.title_edit.text().strip(), self.desc_edit.toPlainText().strip())
+        super().accept()
+
     def get_data(self):
-        return self.title_edit.text().strip(), self.desc_edit.toPlainText().strip()
+        if self._data is None:
+            return self.title_edit.text().strip(), self.desc_edit.toPlainText().strip()
+        return self._data
+
+
+# ----------------------------
+# Palette: shared paint state
+# ----------------------------
+def _font(point_size: int, bold: bool = False) -> QFont:
+    f = QFont()
+    f.setPointSize(point_size)
+    f.setBold(bold)
+    return f
+
+
+class Palette:
+    """
+    Все перья/кисти/шрифты доски — по одному экземпляру на процесс.
+    Item'ы берут их отсюда, а не собирают свои копии.
+    """
+    card_bg = QBrush(QColor("#1a1a1a"))
+    card_border = QPen(QColor("#3a3a3a"), 2)
+    card_selection = QPen(QColor("#7a7a7a"), 2)
+    title_pen = QPen(QColor("#f0f0f0"))
+    title_font = _font(10, bold=True)
+    desc_pen = QPen(QColor("#d0d0d0"))
+    desc_font = _font(9)
+    label_pen = QPen(QColor("#bdbdbd"))
+    bar_pen = QPen(QColor("#2f2f2f"), 1)
+    bar_brush = QBrush(QColor("#0f0f0f"))
+    fill_brush = QBrush(QColor("#3a7bd5"))
+
+    image_selection = QPen(QColor("#9a9a9a"), 2)
+
+    handle_pen = QPen(QColor("#555555"), 1)
+    handle_brush = QBrush(QColor("#232323"))
+
+    # перья линий рисования: цветов/толщин на доске немного, одно перо на пару
+    _stroke_pens: dict[tuple[int, float], QPen] = {}
+
+    @classmethod
+    def stroke_pen(cls, color: QColor, width: float) -> QPen:
+        key = (color.rgba(), float(width))
+        pen = cls._stroke_pens.get(key)
+        if pen is None:
+            pen = QPen(color, width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+            cls._stroke_pens[key] = pen
+        return pen
 
 
 # ----------------------------
@@ -123,40 +111,111 @@ class CardDialog(QDialog):
 # ----------------------------
 class DraggableResizableItem(QGraphicsItem):
     HANDLE_SIZE = 14
+    RESIZE_GRID = 4
+    # рамка выделения рисуется сценой (BoardScene.drawForeground)
+    SELECTION_PEN = Palette.image_selection
+    SELECTION_RADIUS = 0
 
     def __init__(self, item_id: int | None):
         super().__init__()
         self.item_id = item_id
 
+        # пересчитываются в _update_rects() при каждой смене размера
+        self._bounds = QRectF()
+        self._handle = QRectF()
+
         self.setFlags(
             QGraphicsItem.ItemIsMovable |
             QGraphicsItem.ItemIsSelectable |
             QGraphicsItem.ItemSendsGeometryChanges
         )
         self.setAcceptHoverEvents(True)
+        # растр item'а кэшируется и переиспользуется, пока не будет update()
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
         self._resizing = False
         self._resize_start_pos = QPointF()
         self._start_w = 0.0
         self._start_h = 0.0
 
-    def _handle_rect(self, rect: QRectF) -> QRectF:
-        return QRectF(
-            rect.right() - self.HANDLE_SIZE,
-            rect.bottom() - self.HANDLE_SIZE,
-            self.HANDLE_SIZE,
-            self.HANDLE_SIZE
-        )
+        # перерисовка/ресайз копятся и применяются раз за проход event loop,
+        # сколько бы событий мыши ни пришло
+        self._update_pending = False
+        self._pending_full = False
+        self._pending_rect: QRectF | None = None
+        self._pending_size: tuple[float, float] | None = None
+
+        # callback
+        self.on_geometry_changed = None     # (item) -> None
+
+    def _schedule_update(self, rect: QRectF | None = None) -> None:
+        # rect=None — перерисовать item целиком
+        if rect is None:
+            self._pending_full = True
+        elif self._pending_rect is None:
+            self._pending_rect = QRectF(rect)
+        else:
+            self._pending_rect = self._pending_rect.united(rect)
+
+        if not self._update_pending:
+            self._update_pending = True
+            QTimer.singleShot(0, self._flush_update)
+
+    def _flush_update(self) -> None:
+        if not isValid(self):
+            # item удалён (например, scene.clear()) до срабатывания таймера
+            return
+        self._apply_pending_size()
+
+        self._update_pending = False
+        if self._pending_full:
+            self._invalidate()
+        elif self._pending_rect is not None:
+            self._invalidate(self._pending_rect)
+        self._pending_full = False
+        self._pending_rect = None
+
+    def _invalidate(self, rect: QRectF | None = None) -> None:
+        # Единственная точка, где item просит перерисовку. Только update():
+        # Qt склеивает грязные области всех item'ов в один paint event за проход.
+        # Немедленную отрисовку (repaint()) не используем никогда.
+        # scene().update() тоже не подходит — он не сбрасывает DeviceCoordinateCache.
+        if rect is None:
+            self.update()
+        else:
+            self.update(rect)
+
+    def _apply_pending_size(self) -> None:
+        if self._pending_size is None:
+            return
+        w, h = self._pending_size
+        self._pending_size = None
+        self._set_size(w, h)
+        self._persist()
+
+    def _update_rects(self) -> None:
+        # Qt зовёт boundingRect() очень часто, поэтому прямоугольники
+        # собираем один раз на размер, а не на каждый вызов
+        w, h = self._get_size()
+        self._bounds = QRectF(0, 0, w, h)
+        self._handle = QRectF(w - self.HANDLE_SIZE, h - self.HANDLE_SIZE, self.HANDLE_SIZE, self.HANDLE_SIZE)
+
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
+    def _handle_rect(self) -> QRectF:
+        return self._handle
 
     def hoverMoveEvent(self, event):
-        if self._handle_rect(self.boundingRect()).contains(event.pos()):
+        # ручка рисуется только у выделенных (BoardScene.drawForeground) — и работает только у них
+        if self.isSelected() and self._handle_rect().contains(event.pos()):
             self.setCursor(Qt.SizeFDiagCursor)
         else:
             self.setCursor(Qt.ArrowCursor)
         super().hoverMoveEvent(event)
 
     def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton and self._handle_rect(self.boundingRect()).contains(event.pos()):
+        if event.button() == Qt.LeftButton and self.isSelected() and self._handle_rect().contains(event.pos()):
             self._resizing = True
             self._resize_start_pos = event.pos()
             self._start_w, self._start_h = self._get_size()
@@ -167,11 +226,12 @@ class DraggableResizableItem(QGraphicsItem):
     def mouseMoveEvent(self, event):
         if self._resizing:
             delta = event.pos() - self._resize_start_pos
-            new_w = max(100, self._start_w + delta.x())
-            new_h = max(70, self._start_h + delta.y())
-            self._set_size(new_w, new_h)
-            self._persist()
-            self.update()
+            # шаг сетки: пока размер не сменился, кэши картинки/текста остаются валидными
+            new_w = max(100, round((self._start_w + delta.x()) / self.RESIZE_GRID) * self.RESIZE_GRID)
+            new_h = max(70, round((self._start_h + delta.y()) / self.RESIZE_GRID) * self.RESIZE_GRID)
+            if (new_w, new_h) != (self._pending_size or self._get_size()):
+                self._pending_size = (new_w, new_h)
+                self._schedule_update()
             event.accept()
             return
         super().mouseMoveEvent(event)
@@ -179,10 +239,14 @@ class DraggableResizableItem(QGraphicsItem):
     def mouseReleaseEvent(self, event):
         if self._resizing:
             self._resizing = False
+            self._apply_pending_size()
             self._persist()
+            db_flush_geom()
             event.accept()
             return
         super().mouseReleaseEvent(event)
+        # конец перетаскивания — пишем сразу, не дожидаясь таймера
+        db_flush_geom()
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemPositionHasChanged:
@@ -194,7 +258,9 @@ class DraggableResizableItem(QGraphicsItem):
             return
         x, y = self.pos().x(), self.pos().y()
         w, h = self._get_size()
-        db_update_geom(self.item_id, x, y, w, h)
+        db_queue_geom(self.item_id, x, y, w, h)
+        if self.on_geometry_changed:
+            self.on_geometry_changed(self)
 
     def _get_size(self) -> tuple[float, float]:
         raise NotImplementedError
@@ -214,15 +280,56 @@ class CardData:
 
 
 class CardItem(DraggableResizableItem):
+    SELECTION_PEN = Palette.card_selection
+    SELECTION_RADIUS = 18
+
     def __init__(self, item_id: int | None, data: CardData, w=300, h=190):
         super().__init__(item_id)
         self.data = data
         self._w = float(w)
         self._h = float(h)
+        self._progress = QRectF()
+        self._progress_zone = QRectF()
+        self._label_rect = QRectF()
+        self._fill = QRectF()
+        self._label_text = ""
+        self._update_rects()
         self._dragging_progress = False
-
-    def boundingRect(self) -> QRectF:
-        return QRectF(0, 0, self._w, self._h)
+        # прогресс во время перетаскивания меняется на каждое движение мыши,
+        # а в БД пишется один раз — на отпускании
+        self._progress_dirty = False
+        # нужен точный option.exposedRect для частичной перерисовки
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+        # статичная часть карточки (фон, заголовок, описание), записанная один раз
+        self._chrome: QPicture | None = None
+
+        # уже разложенный текст: перенос строк не пересчитывается на каждый paint
+        self._title_static = QStaticText()
+        self._title_static.setTextFormat(Qt.PlainText)
+        self._desc_static = QStaticText()
+        self._desc_static.setTextFormat(Qt.PlainText)
+        self._layout_text()
+
+    @property
+    def title(self) -> str:
+        return self.data.title
+
+    @title.setter
+    def title(self, value: str) -> None:
+        self.data.title = value
+        self._layout_text()
+        self._invalidate_chrome()
+
+    @property
+    def desc(self) -> str:
+        return self.data.desc
+
+    @desc.setter
+    def desc(self, value: str) -> None:
+        self.data.desc = value
+        self._layout_text()
+        self._invalidate_chrome()
 
     def _get_size(self):
         return self._w, self._h
@@ -230,58 +337,93 @@ class CardItem(DraggableResizableItem):
     def _set_size(self, w: float, h: float) -> None:
         self.prepareGeometryChange()
         self._w, self._h = float(w), float(h)
-
-    def _progress_rect(self) -> QRectF:
+        self._update_rects()
+        self._layout_text()
+        self._invalidate_chrome()
+
+    @staticmethod
+    def _static_lines(text: str) -> str:
+        # PlainText в QStaticText склеивает '\n' в пробел; переносом строки
+        # для него служит только LineSeparator (U+2028)
+        return text.replace("\r\n", "\n").replace("\n", "\u2028")
+
+    def _layout_text(self) -> None:
+        self._title_static.setText(self._static_lines(self.data.title))
+        self._title_static.prepare(QTransform(), Palette.title_font)
+
+        self._desc_static.setTextWidth(self._w - 28)
+        self._desc_static.setText(self._static_lines(self.data.desc))
+        self._desc_static.prepare(QTransform(), Palette.desc_font)
+
+    def _invalidate_chrome(self) -> None:
+        self._chrome = None
+        self._schedule_update()
+
+    def _update_rects(self) -> None:
+        super()._update_rects()
         margin = 14
         bar_h = 14
         y = self._h - margin - bar_h
-        return QRectF(margin, y, self._w - 2 * margin, bar_h)
+        self._progress = QRectF(margin, y, self._w - 2 * margin, bar_h)
+        self._label_rect = QRectF(14, self._h - 48, self._w - 28, 16)
+        # полоса прогресса + подпись над ней
+        self._progress_zone = self._progress.united(self._label_rect)
+        self._update_progress_cache()
+
+    def _update_progress_cache(self) -> None:
+        # заливка и подпись меняются только вместе с прогрессом/размером, не на каждый paint
+        bar = self._progress
+        self._fill = QRectF(bar.x(), bar.y(), bar.width() * (self.data.progress / 100.0), bar.height())
+        self._label_text = f"Прогресс: {self.data.progress}%"
 
-    def paint(self, painter: QPainter, option, widget=None):
-        rect = self.boundingRect()
-        painter.setRenderHint(QPainter.Antialiasing, True)
-
-        card_bg = QColor("#1a1a1a")
-        card_border = QColor("#3a3a3a")
-        if self.isSelected():
-            card_border = QColor("#7a7a7a")
-
-        painter.setPen(QPen(card_border, 2))
-        painter.setBrush(QBrush(card_bg))
-        painter.drawRoundedRect(rect, 18, 18)
-
-        painter.setPen(QPen(QColor("#f0f0f0")))
-        title_font = QFont()
-        title_font.setPointSize(10)
-        title_font.setBold(True)
-        painter.setFont(title_font)
-        painter.drawText(QRectF(14, 12, self._w - 28, 22), Qt.TextSingleLine, self.data.title)
-
-        desc_font = QFont()
-        desc_font.setPointSize(9)
-        painter.setFont(desc_font)
-        painter.setPen(QPen(QColor("#d0d0d0")))
-        painter.drawText(QRectF(14, 38, self._w - 28, self._h - 92), Qt.TextWordWrap, self.data.desc)
-
-        painter.setPen(QPen(QColor("#bdbdbd")))
-        painter.drawText(QRectF(14, self._h - 48, self._w - 28, 16),
-                         Qt.TextSingleLine, f"Прогресс: {self.data.progress}%")
+    def _progress_rect(self) -> QRectF:
+        return self._progress
 
-        bar = self._progress_rect()
-        painter.setPen(QPen(QColor("#2f2f2f"), 1))
-        painter.setBrush(QBrush(QColor("#0f0f0f")))
-        painter.drawRoundedRect(bar, 7, 7)
+    def _progress_area(self) -> QRectF:
+        return self._progress_zone
 
-        fill_w = bar.width() * (self.data.progress / 100.0)
-        fill = QRectF(bar.x(), bar.y(), fill_w, bar.height())
-        painter.setPen(Qt.NoPen)
-        painter.setBrush(QBrush(QColor("#3a7bd5")))
-        painter.drawRoundedRect(fill, 7, 7)
+    def _chrome_picture(self) -> QPicture:
+        if self._chrome is None:
+            pic = QPicture()
+            qp = QPainter(pic)
 
-        handle = self._handle_rect(rect)
-        painter.setPen(QPen(QColor("#555555"), 1))
-        painter.setBrush(QBrush(QColor("#232323")))
-        painter.drawRect(handle)
+            qp.setPen(Palette.card_border)
+            qp.setBrush(Palette.card_bg)
+            qp.drawRoundedRect(self.boundingRect(), 18, 18)
+
+            qp.setPen(Palette.title_pen)
+            qp.setFont(Palette.title_font)
+            qp.setClipRect(QRectF(14, 12, self._w - 28, 22))
+            qp.drawStaticText(QPointF(14, 12), self._title_static)
+
+            qp.setFont(Palette.desc_font)
+            qp.setPen(Palette.desc_pen)
+            qp.setClipRect(QRectF(14, 38, self._w - 28, self._h - 92))
+            qp.drawStaticText(QPointF(14, 38), self._desc_static)
+            qp.end()
+            self._chrome = pic
+        return self._chrome
+
+    def paint(self, painter: QPainter, option, widget=None):
+        # перенос строк описания уже посчитан при записи, здесь только проигрываем
+        painter.drawPicture(0, 0, self._chrome_picture())
+
+        # при перетаскивании прогресса Qt просит только его область
+        exposed = option.exposedRect
+        if exposed.intersects(self._progress_area()):
+            # drawPicture восстанавливает состояние painter'а — шрифт из записи
+            # сюда не доходит, ставим явно
+            painter.setFont(Palette.desc_font)
+            painter.setPen(Palette.label_pen)
+            painter.drawText(self._label_rect, Qt.TextSingleLine, self._label_text)
+
+            painter.setPen(Palette.bar_pen)
+            painter.setBrush(Palette.bar_brush)
+            painter.drawRoundedRect(self._progress, 7, 7)
+
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(Palette.fill_brush)
+            painter.drawRoundedRect(self._fill, 7, 7)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton and self._progress_rect().contains(event.pos()):
@@ -301,6 +443,8 @@ class CardItem(DraggableResizableItem):
     def mouseReleaseEvent(self, event):
         if self._dragging_progress:
             self._dragging_progress = False
+            if self._progress_dirty:
+                self._persist_payload()
             event.accept()
             return
         super().mouseReleaseEvent(event)
@@ -309,36 +453,59 @@ class CardItem(DraggableResizableItem):
         bar = self._progress_rect()
         v = (x - bar.x()) / max(1.0, bar.width())
         v = max(0.0, min(1.0, v))
-        self.data.progress = int(round(v * 100))
-        self.update()
-        if self.item_id:
-            db_update_payload(self.item_id, {
-                "title": self.data.title,
-                "desc": self.data.desc,
-                "progress": self.data.progress,
-            })
+        progress = int(round(v * 100))
+        if progress == self.data.progress:
+            return
+        self.data.progress = progress
+        self._progress_dirty = True
+        self._update_progress_cache()
+        self._schedule_update(self._progress_area())
+
+    def _persist_payload(self):
+        self._progress_dirty = False
+        if not self.item_id:
+            return
+        db_update_payload(self.item_id, {
+            "title": self.data.title,
+            "desc": self.data.desc,
+            "progress": self.data.progress,
+        })
 
 
 # ----------------------------
 # Image item
 # ----------------------------
 class ImageItem(DraggableResizableItem):
+    MAX_SIDE = 520
+
     def __init__(self, item_id: int | None, pixmap: QPixmap, path: str, w=None, h=None):
         super().__init__(item_id)
         self.path = path
         self._original = pixmap
 
         if w is None or h is None:
-            w0 = max(160, pixmap.width())
-            h0 = max(160, pixmap.height())
-            scale = min(1.0, 520 / max(w0, h0))
-            w, h = w0 * scale, h0 * scale
+            w, h = self.fit_size(pixmap.width(), pixmap.height())
 
         self._w = float(w)
         self._h = float(h)
-
-    def boundingRect(self) -> QRectF:
-        return QRectF(0, 0, self._w, self._h)
+        self._update_rects()
+        # exposedRect должен быть точным, чтобы блитить только видимый кусок
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        # кэш — DeviceCoordinateCache из базового класса: он рисуется в физических
+        # пикселях; ItemCoordinateCache дал бы paint(widget=None) и размытие на HiDPI
+
+        # smooth-scale дорогой — держим результат, пока размер не поменялся.
+        # _cached_size = (физ. ширина, физ. высота, dpr): тот же логический размер
+        # на другом экране — уже другой пиксмап
+        self._scaled_cache: QPixmap | None = None
+        self._cached_size: tuple[int, int, float] = (0, 0, 1.0)
+
+    @classmethod
+    def fit_size(cls, w: int, h: int) -> tuple[float, float]:
+        w0 = max(160, w)
+        h0 = max(160, h)
+        scale = min(1.0, cls.MAX_SIDE / max(w0, h0))
+        return w0 * scale, h0 * scale
 
     def _get_size(self):
         return self._w, self._h
@@ -346,23 +513,55 @@ class ImageItem(DraggableResizableItem):
     def _set_size(self, w: float, h: float) -> None:
         self.prepareGeometryChange()
         self._w, self._h = float(w), float(h)
+        self._update_rects()
+        # кэш не сбрасываем: paint сам сравнит размер и перескейлит при необходимости
+        self._schedule_update()
+
+    def _scaled_pixmap(self, dpr: float) -> QPixmap:
+        # на HiDPI скейлим сразу в физические пиксели
+        pw, ph = max(1, int(self._w * dpr)), max(1, int(self._h * dpr))
+        if self._scaled_cache is not None and self._cached_size == (pw, ph, dpr):
+            return self._scaled_cache
+
+        # размер совпал с исходником — scaled() дал бы ту же картинку, только дороже
+        if (pw, ph) == (self._original.width(), self._original.height()):
+            scaled = self._original
+            if dpr != 1.0:
+                scaled = QPixmap(self._original)
+                scaled.setDevicePixelRatio(dpr)
+            self._scaled_cache = scaled
+            self._cached_size = (pw, ph, dpr)
+            return scaled
+
+        # общий кэш: одинаковые картинки одного размера скейлятся один раз.
+        # ключ — cacheKey исходника (id() объекта Python переиспользуется после GC,
+        # cacheKey — нет) + физический размер + dpr
+        key = f"{self._original.cacheKey()}:{pw}x{ph}@{dpr:g}"
+        scaled = QPixmapCache.find(key)
+        if scaled is None:
+            scaled = self._original.scaled(pw, ph, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            scaled.setDevicePixelRatio(dpr)
+            # промежуточные размеры во время ресайза в общий кэш не кладём —
+            # они бы вытеснили реально переиспользуемые картинки
+            if not self._resizing:
+                QPixmapCache.insert(key, scaled)
+
+        self._scaled_cache = scaled
+        self._cached_size = (pw, ph, dpr)
+        return scaled
 
     def paint(self, painter: QPainter, option, widget=None):
         rect = self.boundingRect()
-        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
 
-        scaled = self._original.scaled(int(self._w), int(self._h), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-        painter.drawPixmap(0, 0, scaled)
-
-        if self.isSelected():
-            painter.setPen(QPen(QColor("#9a9a9a"), 2))
-            painter.setBrush(Qt.NoBrush)
-            painter.drawRect(rect)
-
-        handle = self._handle_rect(rect)
-        painter.setPen(QPen(QColor("#555555"), 1))
-        painter.setBrush(QBrush(QColor("#232323")))
-        painter.drawRect(handle)
+        # dpr берём у устройства painter'а: при DeviceCoordinateCache это
+        # пиксмап кэша, у которого dpr экрана, а widget может и не прийти
+        scaled = self._scaled_pixmap(painter.device().devicePixelRatioF())
+        exposed = option.exposedRect.intersected(rect)
+        if not exposed.isEmpty():
+            # у HiDPI-пиксмапа источник задаётся в физических пикселях
+            dpr = scaled.devicePixelRatio()
+            source = QRectF(exposed.x() * dpr, exposed.y() * dpr, exposed.width() * dpr, exposed.height() * dpr)
+            painter.drawPixmap(exposed, scaled, source)
 
 
 # ----------------------------
@@ -404,7 +603,7 @@ class BoardTextItem(QGraphicsTextItem):
         if not self.item_id:
             return
         br = self.boundingRect()
-        db_update_geom(self.item_id, self.pos().x(), self.pos().y(), br.width(), br.height())
+        db_queue_geom(self.item_id, self.pos().x(), self.pos().y(), br.width(), br.height())
 
     def _persist_payload(self):
         if not self.item_id:
@@ -416,6 +615,82 @@ class BoardTextItem(QGraphicsTextItem):
         db_update_payload(self.item_id, payload)
 
 
+# ----------------------------
+# Background image loading
+# ----------------------------
+def _read_image(path: str, max_side: int) -> QImage:
+    # декодируем сразу в размер карточки: jpeg умеет уменьшать при декодировании,
+    # и полноразмерный кадр в память не попадает. Общий путь для новых картинок
+    # и загрузки из БД — картинка после перезапуска та же, что при добавлении
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    src = reader.size()
+    if src.isValid():
+        scale = min(1.0, max_side / max(src.width(), src.height(), 1))
+        reader.setScaledSize(QSize(max(1, int(src.width() * scale)), max(1, int(src.height() * scale))))
+    return reader.read()
+
+
+class _LoadSignals(QObject):
+    loaded = Signal(list)  # [(path, QImage), ...]
+
+
+class _LoadTask(QRunnable):
+    """
+    Декодирует пачку картинок вне GUI-потока и отдаёт их одним сигналом,
+    чтобы в БД они легли одной транзакцией.
+    QImage можно собирать в любом потоке, QPixmap — только в GUI.
+    """
+    def __init__(self, paths: list[str], max_side: int):
+        super().__init__()
+        self.paths = paths
+        self.max_side = max_side
+        self.signals = _LoadSignals()
+
+    def run(self):
+        self.signals.loaded.emit([(path, _read_image(path, self.max_side)) for path in self.paths])
+
+
+# ----------------------------
+# Scene: selection overlay
+# ----------------------------
+class BoardScene(QGraphicsScene):
+    """
+    Рамки выделения и ручки ресайза выбранных карточек/картинок
+    рисуются одним проходом поверх сцены: одна настройка пера на группу,
+    а не по смене состояния painter'а в каждом item'е.
+    """
+    def drawForeground(self, painter: QPainter, rect: QRectF):
+        selected = [
+            it for it in self.selectedItems()
+            if isinstance(it, DraggableResizableItem)
+            and it.sceneBoundingRect().intersects(rect)
+        ]
+        if not selected:
+            return
+
+        groups: dict[type, list] = {}
+        for it in selected:
+            groups.setdefault(type(it), []).append(it)
+
+        # рамка внутри boundingRect (сдвиг на полпера), чтобы не оставлять следов
+        painter.setBrush(Qt.NoBrush)
+        for cls, items in groups.items():
+            painter.setPen(cls.SELECTION_PEN)
+            inset = cls.SELECTION_PEN.widthF() / 2
+            for it in items:
+                r = it.mapRectToScene(it.boundingRect()).adjusted(inset, inset, -inset, -inset)
+                if cls.SELECTION_RADIUS:
+                    painter.drawRoundedRect(r, cls.SELECTION_RADIUS, cls.SELECTION_RADIUS)
+                else:
+                    painter.drawRect(r)
+
+        painter.setPen(Palette.handle_pen)
+        painter.setBrush(Palette.handle_brush)
+        for it in selected:
+            painter.drawRect(it.mapRectToScene(it._handle_rect()))
+
+
 # ----------------------------
 # Custom view: modes + zoom
 # ----------------------------
@@ -425,19 +700,46 @@ class BoardView(QGraphicsView):
     MODE_TEXT = "text"
     MODE_ERASE = "erase"
 
+    TIP_POINTS = 16
+
     def __init__(self, scene: QGraphicsScene, parent=None):
         super().__init__(scene, parent)
         self.mode = self.MODE_SELECT
 
         self._drawing = False
+        # мазок в процессе — два item'а: "committed" с линией до N последних точек
+        # и короткий "tip" с хвостом. setPath на каждом кадре получает только хвост,
+        # поэтому стоимость движения не растёт с длиной линии.
         self._current_path = None
         self._current_path_item = None
+        self._tip_path = None
+        self._tip_item = None
+
+        # мышь может слать 500–1000 событий/с — точки копим и отдаём
+        # в path не чаще раза за кадр (~60 Гц)
+        self._pending_pts: list[QPointF] = []
+        self._draw_timer = QTimer(self)
+        self._draw_timer.setSingleShot(True)
+        self._draw_timer.setInterval(16)
+        self._draw_timer.timeout.connect(self._flush_draw_points)
 
         self.draw_color = QColor("#111111")
         self.draw_width = 3
 
         self.setDragMode(QGraphicsView.RubberBandDrag)
 
+        # мазки кистью дают поток мелких обновлений: проще перерисовать
+        # viewport целиком, чем считать грязные регионы по каждому item'у
+        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
+
+        # растеризация на GPU; сглаживание краёв даёт MSAA (4 сэмпла)
+        gl = QOpenGLWidget()
+        fmt = QSurfaceFormat()
+        fmt.setSamples(4)
+        gl.setFormat(fmt)
+        self.setViewport(gl)
+
         # callbacks
         self.on_new_text_at = None          # (scene_pos) -> None
         self.on_draw_finished = None        # (path_item, path, color, width) -> None
@@ -453,7 +755,27 @@ class BoardView(QGraphicsView):
             self.setDragMode(QGraphicsView.NoDrag)
 
     def _pen(self) -> QPen:
-        return QPen(self.draw_color, self.draw_width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        return Palette.stroke_pen(self.draw_color, self.draw_width)
+
+    def _flush_draw_points(self):
+        if not self._pending_pts or self._tip_path is None:
+            self._pending_pts.clear()
+            return
+        for pt in self._pending_pts:
+            self._tip_path.lineTo(pt)
+        self._pending_pts.clear()
+
+        if self._tip_path.elementCount() >= self.TIP_POINTS:
+            self._merge_tip()
+        else:
+            self._tip_item.setPath(self._tip_path)
+
+    def _merge_tip(self):
+        # хвост переезжает в основную линию, новый хвост начинается с последней точки
+        self._current_path.connectPath(self._tip_path)
+        self._current_path_item.setPath(self._current_path)
+        self._tip_path = QPainterPath(self._current_path.currentPosition())
+        self._tip_item.setPath(self._tip_path)
 
     def wheelEvent(self, event):
         # Ctrl + wheel -> zoom
@@ -474,6 +796,10 @@ class BoardView(QGraphicsView):
             self._current_path_item = self.scene().addPath(self._current_path, self._pen())
             self._current_path_item.setFlag(QGraphicsItem.ItemIsSelectable, False)
             self._current_path_item.setFlag(QGraphicsItem.ItemIsMovable, False)
+            self._tip_path = QPainterPath(p)
+            self._tip_item = self.scene().addPath(self._tip_path, self._pen())
+            self._tip_item.setFlag(QGraphicsItem.ItemIsSelectable, False)
+            self._tip_item.setFlag(QGraphicsItem.ItemIsMovable, False)
             event.accept()
             return
 
@@ -495,9 +821,11 @@ class BoardView(QGraphicsView):
 
     def mouseMoveEvent(self, event):
         if self._drawing and self.mode == self.MODE_DRAW and self._current_path is not None:
-            p = self.mapToScene(event.pos())
-            self._current_path.lineTo(p)
-            self._current_path_item.setPath(self._current_path)
+            self._pending_pts.append(self.mapToScene(event.pos()))
+            # не перезапускаем таймер на каждом событии, иначе при непрерывном
+            # движении линия не обновится вовсе
+            if not self._draw_timer.isActive():
+                self._draw_timer.start()
             event.accept()
             return
 
@@ -513,6 +841,13 @@ class BoardView(QGraphicsView):
     def mouseReleaseEvent(self, event):
         if self._drawing and self.mode == self.MODE_DRAW:
             self._drawing = False
+            self._draw_timer.stop()
+            self._flush_draw_points()
+            if self._tip_item is not None:
+                self._merge_tip()
+                self.scene().removeItem(self._tip_item)
+            self._tip_path = None
+            self._tip_item = None
             if self.on_draw_finished and self._current_path is not None and self._current_path_item is not None:
                 self.on_draw_finished(self._current_path_item, self._current_path, self.draw_color, self.draw_width)
             self._current_path = None
@@ -522,6 +857,136 @@ class BoardView(QGraphicsView):
         super().mouseReleaseEvent(event)
 
 
+# ----------------------------
+# Scene index (struct-of-arrays)
+# ----------------------------
+class SceneIndex:
+    """
+    Зеркало геометрии карточек/картинок (и отдельно — линий рисования)
+    в виде параллельных массивов numpy: выборки по id и по области идут
+    векторно, без обхода scene.items().
+    """
+    # массивы растут с запасом (×2), а не копируются целиком на каждый add
+    INITIAL_CAPACITY = 64
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._n = 0
+        self._alloc(self.INITIAL_CAPACITY)
+        self._items: list = []
+        self._rows: dict[int, int] = {}
+
+    def _alloc(self, capacity: int):
+        n = self._n
+        ids = np.empty(capacity, np.int64)
+        geom = np.empty((capacity, 4), np.float32)  # x, y, w, h
+        if n:
+            ids[:n] = self._ids[:n]
+            geom[:n] = self._geom[:n]
+        self._ids = ids
+        self._geom = geom
+
+    def __len__(self):
+        return self._n
+
+    def add(self, item: DraggableResizableItem):
+        w, h = item._get_size()
+        self.add_rect(int(item.item_id), QRectF(item.pos().x(), item.pos().y(), w, h), item)
+
+    def add_rect(self, item_id: int, rect: QRectF, item):
+        i = self._n
+        if i == len(self._ids):
+            self._alloc(2 * len(self._ids))
+        self._ids[i] = item_id
+        self._geom[i] = (rect.x(), rect.y(), rect.width(), rect.height())
+        self._rows[item_id] = i
+        self._items.append(item)
+        self._n = i + 1
+
+    def update(self, item: DraggableResizableItem):
+        i = self._rows.get(int(item.item_id))
+        if i is None:
+            return
+        w, h = item._get_size()
+        self._geom[i] = (item.pos().x(), item.pos().y(), w, h)
+
+    def remove_ids(self, ids):
+        for item_id in ids:
+            self.remove(int(item_id))
+
+    def remove(self, item_id: int):
+        # на место удалённой строки переезжает последняя — O(1), порядок строк не храним
+        i = self._rows.pop(item_id, None)
+        if i is None:
+            return
+        last = self._n - 1
+        if i != last:
+            moved = int(self._ids[last])
+            self._ids[i] = moved
+            self._geom[i] = self._geom[last]
+            self._items[i] = self._items[last]
+            self._rows[moved] = i
+        self._items.pop()
+        self._n = last
+
+    def visible_indices(self, rect: QRectF) -> np.ndarray:
+        vx, vy, vw, vh = rect.x(), rect.y(), rect.width(), rect.height()
+        g = self._geom[:self._n]
+        xs, ys = g[:, 0], g[:, 1]
+        return np.flatnonzero(
+            (xs + g[:, 2] > vx) & (xs < vx + vw) &
+            (ys + g[:, 3] > vy) & (ys < vy + vh)
+        )
+
+    def items_at(self, indices) -> list:
+        return [self._items[i] for i in indices]
+
+
+# ----------------------------
+# Stroke simplification
+# ----------------------------
+def _rdp(pts: np.ndarray, epsilon: float) -> np.ndarray:
+    """
+    Ramer–Douglas–Peucker: выкидывает точки, которые отстоят от хорды
+    меньше чем на epsilon. Расстояния по отрезку считаются векторно.
+    """
+    n = len(pts)
+    if n < 3:
+        return pts
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        p0, p1 = pts[a], pts[b]
+        seg = pts[a + 1:b]
+        dx, dy = p1 - p0
+        norm = np.hypot(dx, dy)
+        if norm == 0:
+            dist = np.hypot(seg[:, 0] - p0[0], seg[:, 1] - p0[1])
+        else:
+            dist = np.abs(dx * (seg[:, 1] - p0[1]) - dy * (seg[:, 0] - p0[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > epsilon:
+            m = a + 1 + i
+            keep[m] = True
+            stack.append((a, m))
+            stack.append((m, b))
+    return pts[keep]
+
+
+def _path_from_points(pts) -> QPainterPath:
+    path = QPainterPath(QPointF(pts[0][0], pts[0][1]))
+    for x, y in pts[1:]:
+        path.lineTo(QPointF(x, y))
+    return path
+
+
 # ----------------------------
 # Main window
 # ----------------------------
@@ -572,9 +1037,20 @@ class MainWindow(QMainWindow):
         left.addStretch(1)
 
         # scene/view
-        self.scene = QGraphicsScene()
+        self.scene = BoardScene()
         self.scene.setSceneRect(0, 0, 3400, 2200)
+        # элементы постоянно двигаются: линейный поиск дешевле пересборки BSP-дерева
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.view = BoardView(self.scene)
+        # хинты ставим один раз на весь кадр, а не переключаем в paint() каждого item'а
+        self.view.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform | QPainter.TextAntialiasing)
+        # фон однотонный: растрируем его один раз и копируем, пока не сменится цвет/размер
+        self.view.setCacheMode(QGraphicsView.CacheBackground)
+
+        self._pool = QThreadPool(self)
+        self.index = SceneIndex()
+        # bbox линий для ластика: draw_id -> QGraphicsPathItem
+        self.draw_index = SceneIndex()
 
         main.addLayout(left, 0)
         main.addWidget(self.view, 1)
@@ -608,8 +1084,18 @@ class MainWindow(QMainWindow):
         btn_delete.clicked.connect(self.delete_selected)
         btn_bg.clicked.connect(self.pick_bg)
 
+        # отложенная запись геометрии (drag/resize)
+        self._geom_timer = QTimer(self)
+        self._geom_timer.setInterval(200)
+        self._geom_timer.timeout.connect(db_flush_geom)
+        self._geom_timer.start()
+
         self.load_from_db()
 
+    def closeEvent(self, event):
+        db_flush_geom()
+        super().closeEvent(event)
+
     def apply_theme(self):
         self.setStyleSheet("""
             QWidget { background: #0f0f0f; color: #eaeaea; }
@@ -626,22 +1112,27 @@ class MainWindow(QMainWindow):
 
     # ---------- pickers ----------
     def pick_bg(self):
+        from PySide6.QtWidgets import QColorDialog
         c = QColorDialog.getColor(self.bg_color, self, "Выбери цвет фона")
         if c.isValid():
             self.bg_color = c
             self.scene.setBackgroundBrush(self.bg_color)
+            self.view.resetCachedContent()
 
     def pick_draw_color(self):
+        from PySide6.QtWidgets import QColorDialog
         c = QColorDialog.getColor(self.view.draw_color, self, "Выбери цвет кисти")
         if c.isValid():
             self.view.draw_color = c
 
     def pick_draw_width(self):
+        from PySide6.QtWidgets import QInputDialog
         v, ok = QInputDialog.getInt(self, "Толщина кисти", "Пиксели:", self.view.draw_width, 1, 40, 1)
         if ok:
             self.view.draw_width = v
 
     def pick_text_color(self):
+        from PySide6.QtWidgets import QColorDialog
         c = QColorDialog.getColor(self.current_text_color, self, "Выбери цвет текста")
         if c.isValid():
             self.current_text_color = c
@@ -657,9 +1148,28 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "Инфо", "Выдели текст на доске, чтобы применить цвет.")
 
     # ---------- load/save ----------
+    def _add_board_item(self, item: DraggableResizableItem):
+        self.scene.addItem(item)
+        if item.item_id:
+            self.index.add(item)
+            item.on_geometry_changed = self.index.update
+
     def load_from_db(self):
-        self.scene.clear()
-        for rec in db_load_all():
+        # пачкой: без сигналов сцены и перерисовки view на каждый addItem
+        self.view.setUpdatesEnabled(False)
+        self.scene.blockSignals(True)
+        try:
+            self.scene.clear()
+            self.index.clear()
+            self.draw_index.clear()
+            self._load_records(db_load_all())
+        finally:
+            self.scene.blockSignals(False)
+            self.view.setUpdatesEnabled(True)
+        self.view.viewport().update()
+
+    def _load_records(self, records: list[dict]):
+        for rec in records:
             t = rec["type"]
             p = rec["payload"]
 
@@ -671,18 +1181,18 @@ class MainWindow(QMainWindow):
                 )
                 item = CardItem(rec["id"], data, w=rec["w"], h=rec["h"])
                 item.setPos(rec["x"], rec["y"])
-                self.scene.addItem(item)
+                self._add_board_item(item)
 
             elif t == "image":
-                path = p.get("path")
+                path = rec["path"]
                 if not path:
                     continue
-                pix = QPixmap(path)
+                pix = QPixmap.fromImage(_read_image(path, ImageItem.MAX_SIDE))
                 if pix.isNull():
                     continue
                 item = ImageItem(rec["id"], pix, path=path, w=rec["w"], h=rec["h"])
                 item.setPos(rec["x"], rec["y"])
-                self.scene.addItem(item)
+                self._add_board_item(item)
 
             elif t == "text":
                 html = p.get("html", "")
@@ -692,20 +1202,23 @@ class MainWindow(QMainWindow):
                 self.scene.addItem(item)
 
             elif t == "draw":
-                pts = p.get("points", [])
+                if rec["points_blob"]:
+                    pts = np.frombuffer(rec["points_blob"], dtype=np.float32).reshape(-1, 2).tolist()
+                else:
+                    # старые записи: точки JSON-списком в payload
+                    pts = p.get("points", [])
                 width = float(p.get("width", 3))
                 color = QColor(p.get("color", "#111111"))
 
                 if len(pts) < 2:
                     continue
-                path = QPainterPath(QPointF(pts[0][0], pts[0][1]))
-                for x, y in pts[1:]:
-                    path.lineTo(QPointF(x, y))
+                path = _path_from_points(pts)
 
-                pen = QPen(color, width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+                pen = Palette.stroke_pen(color, width)
                 path_item = self.scene.addPath(path, pen)
                 # связываем с БД id, чтобы ластик мог удалять
                 path_item.setData(0, rec["id"])
+                self.draw_index.add_rect(int(rec["id"]), path_item.sceneBoundingRect(), path_item)
 
     # ---------- create items ----------
     def add_card(self):
@@ -724,32 +1237,48 @@ class MainWindow(QMainWindow):
 
         item = CardItem(item_id, CardData(title=title, desc=desc, progress=0), w=w, h=h)
         item.setPos(x, y)
-        self.scene.addItem(item)
+        self._add_board_item(item)
         item.setSelected(True)
         self.view.centerOn(item)
 
     def add_image(self):
-        path, _ = QFileDialog.getOpenFileName(
-            self, "Выбери изображение", "", "Изображения (*.png *.jpg *.jpeg *.webp)"
+        from PySide6.QtWidgets import QFileDialog
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Выбери изображения", "", "Изображения (*.png *.jpg *.jpeg *.webp)"
         )
-        if not path:
+        if not paths:
             return
 
-        pix = QPixmap(path)
-        if pix.isNull():
+        # декодирование идёт в пуле потоков, чтобы большие файлы не подвешивали UI
+        task = _LoadTask(paths, ImageItem.MAX_SIDE)
+        task.signals.loaded.connect(self._on_images_loaded)
+        self._pool.start(task)
+
+    def _on_images_loaded(self, results: list):
+        # QPixmap можно создавать только в GUI-потоке
+        loaded = []
+        for path, image in results:
+            pix = QPixmap.fromImage(image)
+            if not pix.isNull():
+                loaded.append((path, pix))
+        if len(loaded) < len(results):
             QMessageBox.warning(self, "Ошибка", "Не удалось загрузить картинку.")
+        if not loaded:
             return
 
-        tmp = ImageItem(None, pix, path=path)
-        w, h = tmp._get_size()
-
-        x, y = 120.0, 120.0
-        item_id = db_insert_item("image", x, y, w, h, {"path": path})
-
-        item = ImageItem(item_id, pix, path=path, w=w, h=h)
-        item.setPos(x, y)
-        self.scene.addItem(item)
-        item.setSelected(True)
+        # несколько картинок раскладываем лесенкой, чтобы не легли одна на другую
+        rows = []
+        for k, (path, pix) in enumerate(loaded):
+            w, h = ImageItem.fit_size(pix.width(), pix.height())
+            rows.append(("image", 120.0 + k * 40, 120.0 + k * 40, w, h, {}, 0, path))
+        ids = db_insert_many(rows)
+
+        self.scene.clearSelection()
+        for item_id, (path, pix), (_, x, y, w, h, _, _, _) in zip(ids, loaded, rows):
+            item = ImageItem(item_id, pix, path=path, w=w, h=h)
+            item.setPos(x, y)
+            self._add_board_item(item)
+            item.setSelected(True)
         self.view.centerOn(item)
 
     def add_text_at(self, scene_pos: QPointF):
@@ -767,44 +1296,60 @@ class MainWindow(QMainWindow):
         self.view.centerOn(item)
 
     def save_draw_path(self, path_item, path: QPainterPath, color: QColor, width: int):
-        # превращаем stroke в список точек
-        pts = []
-        for i in range(path.elementCount()):
+        # превращаем stroke в массив точек (n, 2) — сразу в numpy, без списка списков
+        n = path.elementCount()
+        arr = np.empty((n, 2), dtype=np.float64)
+        for i in range(n):
             el = path.elementAt(i)
-            pts.append([float(el.x), float(el.y)])
+            arr[i, 0] = el.x
+            arr[i, 1] = el.y
 
-        if len(pts) < 2:
+        # на гладких мазках остаётся в разы меньше точек — визуально то же самое
+        arr = _rdp(arr, epsilon=0.5)
+        if len(arr) < 2:
             self.scene.removeItem(path_item)
             return
 
+        # на доске остаётся та же линия, что будет загружена из БД
+        path = _path_from_points(arr.tolist())
+        path_item.setPath(path)
+
         br = path.boundingRect()
-        payload = {"points": pts, "width": width, "color": color.name()}
-        draw_id = db_insert_item("draw", br.x(), br.y(), br.width(), br.height(), payload)
+        payload = {"width": width, "color": color.name()}
+        blob = arr.astype(np.float32).tobytes()
+        draw_id = db_insert_item("draw", br.x(), br.y(), br.width(), br.height(), payload, points_blob=blob)
 
         # помечаем item, чтобы ластик мог удалить и из сцены, и из БД
         path_item.setData(0, draw_id)
+        self.draw_index.add_rect(int(draw_id), path_item.sceneBoundingRect(), path_item)
 
     # ---------- eraser ----------
     def erase_at(self, scene_pos: QPointF):
         # удаляем только линии рисования (QGraphicsPathItem), которые рядом с курсором
         # (простая логика: всё, что "под курсором" в маленьком радиусе)
         r = 8.0
-        hit = self.scene.items(QRectF(scene_pos.x() - r, scene_pos.y() - r, r * 2, r * 2))
-        for it in hit:
-            # QGraphicsPathItem тип напрямую не импортируем, проверяем по наличию data(0)
-            draw_id = it.data(0)
-            if draw_id:
-                db_delete(int(draw_id))
-                self.scene.removeItem(it)
-                return  # стираем по одному за шаг (приятнее)
+        area = QRectF(scene_pos.x() - r, scene_pos.y() - r, r * 2, r * 2)
+        # кандидаты — по bbox из индекса, точная проверка — по контуру линии;
+        # сверху лежат те, что нарисованы позже (id больше)
+        hits = self.draw_index.items_at(self.draw_index.visible_indices(area))
+        for it in sorted(hits, key=lambda it: int(it.data(0)), reverse=True):
+            if not it.shape().intersects(area):
+                continue
+            draw_id = int(it.data(0))
+            db_delete(draw_id)
+            self.scene.removeItem(it)
+            self.draw_index.remove(draw_id)
+            return  # стираем по одному за шаг (приятнее)
 
     # ---------- delete selected ----------
     def delete_selected(self):
+        deleted = []
         for it in list(self.scene.selectedItems()):
             # карточки/картинки имеют item_id
             if hasattr(it, "item_id") and getattr(it, "item_id"):
                 db_delete(int(it.item_id))
                 self.scene.removeItem(it)
+                deleted.append(int(it.item_id))
                 continue
 
             # текст
@@ -813,9 +1358,11 @@ class MainWindow(QMainWindow):
                 self.scene.removeItem(it)
                 continue
 
+        self.index.remove_ids(deleted)
+
 
 def main():
-    db_init()
+    init_db()
     app = QApplication(sys.argv)
     w = MainWindow()
     w.show()
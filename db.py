@@ -1,11 +1,114 @@
+import atexit
+import logging
 import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
-DB_PATH = Path(__file__).with_name("myasana.db")
+import orjson
 
+DB_PATH = Path(__file__).with_name("deathnote.db")
 
-def get_conn():
-    return sqlite3.connect(DB_PATH)
+_log = logging.getLogger(__name__)
+
+
+def _dumps(payload: dict) -> str:
+    # orjson сразу отдаёт UTF-8 (как ensure_ascii=False); колонка TEXT — поэтому decode()
+    return orjson.dumps(payload).decode()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # строки доступны и по индексу, и по имени колонки
+    conn.row_factory = sqlite3.Row
+    # все вкладки и доска ходят через get_conn(), поэтому настройки — здесь,
+    # а не в init_db (вкладки могут открыть БД и без него).
+    # под WAL synchronous=NORMAL безопасен и снимает fsync с каждого commit;
+    # mmap — чтение страниц без копирования (256 МБ), кэш страниц — ~64 МБ
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA mmap_size=268435456;")
+    conn.execute("PRAGMA cache_size=-64000;")
+    return conn
+
+
+_CONN: sqlite3.Connection | None = None
+
+
+def get_conn() -> sqlite3.Connection:
+    # одно соединение на весь процесс: без open/close и перечитывания
+    # заголовка WAL на каждую мелкую запись. Все вызовы — из GUI-потока.
+    global _CONN
+    if _CONN is None:
+        _CONN = _connect()
+        atexit.register(_CONN.close)
+    return _CONN
+
+
+# чтения из потоков пула (tabs.query.QueryRunner): у каждого потока своё
+# соединение, общее GUI-соединение из чужих потоков не трогаем
+_READ_LOCAL = threading.local()
+
+
+def get_read_conn() -> sqlite3.Connection:
+    conn = getattr(_READ_LOCAL, "conn", None)
+    if conn is None:
+        conn = _READ_LOCAL.conn = _connect()
+    return conn
+
+
+# записи, результат которых GUI не ждёт, уходят в один фоновый поток со своим
+# соединением: commit/fsync не держит цикл событий. Поток один — порядок записей
+# сохраняется. При выходе очередь дописывается до конца (atexit).
+_WRITER: ThreadPoolExecutor | None = None
+_WRITER_CONN: sqlite3.Connection | None = None
+
+
+def _write(sql: str, params: tuple):
+    global _WRITER_CONN
+    if _WRITER_CONN is None:
+        _WRITER_CONN = _connect()
+    with _WRITER_CONN as conn:
+        conn.execute(sql, params)
+
+
+def _shutdown_writer():
+    _WRITER.shutdown(wait=True)
+    if _WRITER_CONN is not None:
+        _WRITER_CONN.close()
+
+
+def db_write_async(sql: str, params: tuple = ()) -> Future:
+    """
+    Ошибка записи в любом случае попадает в лог; кому нужно откатить UI —
+    вешает свой add_done_callback на возвращённый Future (он вызывается
+    в потоке записи, в GUI — только через сигнал).
+    """
+    global _WRITER
+    if _WRITER is None:
+        _WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        atexit.register(_shutdown_writer)
+    fut = _WRITER.submit(_write, sql, params)
+    fut.add_done_callback(lambda f: _log_write_error(f, sql))
+    return fut
+
+
+def on_write_failed(fut: Future, callback):
+    """
+    callback() — если фоновая запись не прошла. Вызывается в потоке записи:
+    в GUI передавать только через сигнал.
+    """
+    def _done(f: Future):
+        if f.exception() is not None:
+            callback()
+    fut.add_done_callback(_done)
+
+
+def _log_write_error(fut: Future, sql: str):
+    exc = fut.exception()
+    if exc is not None:
+        _log.error("фоновая запись не удалась: %s (%s)", exc, sql)
 
 
 def init_db():
@@ -35,10 +138,145 @@ def init_db():
         conn.execute("""
         CREATE TABLE IF NOT EXISTS board_items (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            type TEXT NOT NULL,
-            x REAL,
-            y REAL,
-            z INTEGER DEFAULT 0,
-            payload TEXT
+            type TEXT NOT NULL,          -- 'card' | 'image' | 'text' | 'draw'
+            x INTEGER NOT NULL,          -- целые пиксели сцены
+            y INTEGER NOT NULL,
+            w REAL NOT NULL,
+            h REAL NOT NULL,
+            z INTEGER NOT NULL DEFAULT 0,
+            payload TEXT NOT NULL        -- JSON
         )
         """)
+
+        # миграция: точки мазков храним сырым float32 (x, y, x, y, ...), а не JSON-списком
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(board_items)")}
+        if "points_blob" not in cols:
+            conn.execute("ALTER TABLE board_items ADD COLUMN points_blob BLOB")
+
+        # миграция: путь картинки — отдельной колонкой, чтобы не разбирать JSON на загрузке
+        if "path" not in cols:
+            conn.execute("ALTER TABLE board_items ADD COLUMN path TEXT")
+            conn.execute(
+                "UPDATE board_items SET path = json_extract(payload, '$.path') WHERE type = 'image'"
+            )
+
+        # миграция: x/y из REAL в INTEGER. Тип колонки в SQLite не меняется через
+        # ALTER — пересобираем таблицу (одной транзакцией), координаты округляем
+        types = {r[1]: r[2] for r in conn.execute("PRAGMA table_info(board_items)")}
+        if types["x"].upper() == "REAL":
+            conn.commit()
+            conn.executescript("""
+            BEGIN;
+            CREATE TABLE board_items_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL,
+                x INTEGER NOT NULL,
+                y INTEGER NOT NULL,
+                w REAL NOT NULL,
+                h REAL NOT NULL,
+                z INTEGER NOT NULL DEFAULT 0,
+                payload TEXT NOT NULL,
+                points_blob BLOB,
+                path TEXT
+            );
+            INSERT INTO board_items_new(id, type, x, y, w, h, z, payload, points_blob, path)
+                SELECT id, type, CAST(ROUND(x) AS INTEGER), CAST(ROUND(y) AS INTEGER),
+                       w, h, z, payload, points_blob, path
+                FROM board_items;
+            DROP TABLE board_items;
+            ALTER TABLE board_items_new RENAME TO board_items;
+            COMMIT;
+            """)
+
+        # db_load_all идёт ORDER BY z, id — индекс отдаёт строки уже в этом порядке
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_board_items_z_id ON board_items(z, id)")
+        # вкладка доски читает только картинки — WHERE type = 'image'
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_board_items_type ON board_items(type)")
+
+
+def db_insert_item(item_type: str, x: float, y: float, w: float, h: float, payload: dict, z: int = 0,
+                   points_blob: bytes | None = None, path: str | None = None) -> int:
+    with get_conn() as conn:
+        return int(conn.execute(
+            "INSERT INTO board_items(type, x, y, w, h, z, payload, points_blob, path)"
+            " VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?) RETURNING id",
+            (item_type, round(x), round(y), w, h, z, _dumps(payload), points_blob, path),
+        ).fetchone()[0])
+
+
+def db_insert_many(rows: list[tuple]) -> list[int]:
+    """
+    rows: (type, x, y, w, h, payload, z, path). Всё в одной транзакции — один commit
+    (и один fsync) на пачку вместо одного на каждую запись.
+    """
+    with get_conn() as conn:
+        return [
+            int(conn.execute(
+                "INSERT INTO board_items(type, x, y, w, h, z, payload, path) VALUES(?, ?, ?, ?, ?, ?, ?, ?) RETURNING id",
+                (item_type, round(x), round(y), w, h, z, _dumps(payload), path),
+            ).fetchone()[0])
+            for item_type, x, y, w, h, payload, z, path in rows
+        ]
+
+
+def db_update_pos(item_id: int, x: float, y: float):
+    # один и тот же текст SQL на долгоживущем соединении — sqlite3 берёт
+    # подготовленный statement из своего кэша, без повторного разбора
+    db_write_async(
+        "UPDATE board_items SET x=?, y=? WHERE id=?",
+        (round(x), round(y), int(item_id)),
+    )
+
+
+# drag/resize шлют геометрию на каждое движение мыши — копим последнее значение
+# per item и пишем пачкой в одной транзакции (см. MainWindow._geom_timer)
+_dirty_geom: dict[int, tuple[int, int, float, float]] = {}
+
+
+def db_queue_geom(item_id: int, x: float, y: float, w: float, h: float):
+    _dirty_geom[int(item_id)] = (round(x), round(y), float(w), float(h))
+
+
+def db_flush_geom():
+    if not _dirty_geom:
+        return
+    rows = [(x, y, w, h, item_id) for item_id, (x, y, w, h) in _dirty_geom.items()]
+    _dirty_geom.clear()
+    with get_conn() as conn:
+        conn.executemany("UPDATE board_items SET x=?, y=?, w=?, h=? WHERE id=?", rows)
+
+
+def db_update_payload(item_id: int, payload: dict):
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE board_items SET payload=? WHERE id=?",
+            (_dumps(payload), int(item_id)),
+        )
+
+
+def db_delete(item_id: int):
+    _dirty_geom.pop(int(item_id), None)
+    with get_conn() as conn:
+        conn.execute("DELETE FROM board_items WHERE id=?", (int(item_id),))
+
+
+def db_load_all():
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT id, type, x, y, w, h, z, payload, points_blob, path FROM board_items ORDER BY z, id"
+        ).fetchall()
+    out = []
+    for r in rows:
+        out.append({
+            "id": int(r[0]),
+            "type": r[1],
+            "x": float(r[2]),
+            "y": float(r[3]),
+            "w": float(r[4]),
+            "h": float(r[5]),
+            "z": int(r[6]),
+            "payload": orjson.loads(r[7]) if r[7] else {},
+            "points_blob": r[8],
+            "path": r[9],
+        })
+    return out
@@ -2,32 +2,71 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton,
     QFileDialog, QGraphicsView, QGraphicsScene
 )
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QPixmap, QImage, QImageReader, QPixmapCache
 from PySide6.QtWidgets import QGraphicsPixmapItem
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, Signal
 import db
-import json
+from tabs.query import QueryRunner
+
+
+# картинки на вкладке не больше MAX_SIDE по длинной стороне: jpeg уменьшается
+# прямо при декодировании, полноразмерный кадр в память не попадает.
+# этот же размер пишется в w/h, так что после перезагрузки картинка та же
+MAX_SIDE = 800
+
+
+# кэша здесь нет: готовые картинки держит QPixmapCache (BoardTab._pixmap),
+# а за одну загрузку каждый путь декодируется один раз (BoardTab._on_rows)
+def _load_image(path):
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and max(size.width(), size.height()) > MAX_SIDE:
+        size.scale(MAX_SIDE, MAX_SIDE, Qt.KeepAspectRatio)
+        reader.setScaledSize(size)
+    return reader.read()
+
+
+class _DecodeSignals(QObject):
+    decoded = Signal(str, QImage)  # path, image
+
+
+class DecodeTask(QRunnable):
+    """
+    Декодирует картинку доски в пуле потоков.
+    QImage можно собирать в любом потоке, QPixmap — только в GUI.
+    """
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.signals = _DecodeSignals()
+
+    def run(self):
+        self.signals.decoded.emit(self.path, _load_image(self.path))
 
 
 class DraggableImage(QGraphicsPixmapItem):
-    def __init__(self, item_id, pixmap):
+    def __init__(self, item_id, pixmap, x=0, y=0):
         super().__init__(pixmap)
         self.item_id = item_id
+        self.setPos(x, y)
+        # последняя записанная в БД позиция, в целых пикселях
+        self._last_saved = (round(x), round(y))
         self.setFlags(
             QGraphicsPixmapItem.ItemIsMovable |
-            QGraphicsPixmapItem.ItemIsSelectable |
-            QGraphicsPixmapItem.ItemSendsGeometryChanges
+            QGraphicsPixmapItem.ItemIsSelectable
         )
+        # при перетаскивании картинка не перерисовывается, а копируется из кэша
+        self.setCacheMode(QGraphicsPixmapItem.DeviceCoordinateCache)
 
-    def itemChange(self, change, value):
-        if change == QGraphicsPixmapItem.ItemPositionHasChanged:
-            pos = self.pos()
-            with db.get_conn() as conn:
-                conn.execute(
-                    "UPDATE board_items SET x=?, y=? WHERE id=?",
-                    (pos.x(), pos.y(), self.item_id)
-                )
-        return super().itemChange(change, value)
+    # позицию пишем один раз на отпускании, а не на каждый шаг перетаскивания;
+    # сдвиг меньше пикселя (или клик без движения) записи не даёт
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        pos = (round(self.pos().x()), round(self.pos().y()))
+        if pos != self._last_saved:
+            db.db_update_pos(self.item_id, *pos)
+            self._last_saved = pos
 
 
 class BoardTab(QWidget):
@@ -41,46 +80,106 @@ class BoardTab(QWidget):
         layout.addWidget(add_img_btn)
 
         self.scene = QGraphicsScene()
+        # картинок на вкладке немного, позиционных запросов почти нет — BSP-дерево
+        # только пересчитывалось бы на каждый addItem и перетаскивание
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
         self.view = QGraphicsView(self.scene)
+        # крупные картинки двигаются по всей сцене — одна перерисовка кадра
+        # дешевле, чем пересчёт множества грязных областей
+        self.view.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
         layout.addWidget(self.view)
 
+        self._pool = QThreadPool(self)
+        # готовые к добавлению картинки копятся и уходят в сцену пачкой
+        self._pending_items = []
+        # path -> [(item_id, x, y), ...]: кто ждёт декодирования этого файла
+        self._awaiting = {}
+        # готовые QPixmap по пути файла держит Qt, с общим лимитом памяти (в КБ)
+        QPixmapCache.setCacheLimit(102400)
         self.load_items()
 
     def add_image(self):
-        path, _ = QFileDialog.getOpenFileName(
-            self, "Select image", "", "Images (*.png *.jpg *.jpeg)"
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Select images", "", "Images (*.png *.jpg *.jpeg)"
         )
-        if not path:
+        if not paths:
             return
 
-        pix = QPixmap(path)
-        if pix.isNull():
+        loaded = []
+        for path in paths:
+            pix = self._pixmap(path)
+            if not pix.isNull():
+                loaded.append((path, pix))
+        if not loaded:
             return
 
-        payload = json.dumps({"path": path})
+        # все файлы — одной транзакцией, id возвращаются через RETURNING
+        rows = [
+            ("image", 20 + 20 * i, 20, pix.width(), pix.height(), {}, 0, path)
+            for i, (path, pix) in enumerate(loaded)
+        ]
+        ids = db.db_insert_many(rows)
 
-        with db.get_conn() as conn:
-            cur = conn.execute(
-                "INSERT INTO board_items(type, x, y, payload) VALUES(?, ?, ?, ?)",
-                ("image", 20, 20, payload)
-            )
-            item_id = cur.lastrowid
-
-        item = DraggableImage(item_id, pix)
-        item.setPos(20, 20)
-        self.scene.addItem(item)
+        for item_id, row, (_, pix) in zip(ids, rows, loaded):
+            self._add_item(item_id, row[1], row[2], pix)
 
     def load_items(self):
-        with db.get_conn() as conn:
-            rows = conn.execute(
-                "SELECT id, type, x, y, payload FROM board_items"
-            ).fetchall()
-
-        for r in rows:
-            if r[1] == "image":
-                data = json.loads(r[4])
-                pix = QPixmap(data["path"])
-                if not pix.isNull():
-                    item = DraggableImage(r[0], pix)
-                    item.setPos(r[2], r[3])
-                    self.scene.addItem(item)
+        task = QueryRunner("SELECT id, x, y, path FROM board_items WHERE type = 'image'")
+        task.signals.finished.connect(self._on_rows)
+        self._pool.start(task)
+
+    def _on_rows(self, rows):
+        # картинки декодируются параллельно, вкладка показывается сразу.
+        # один файл на доске может стоять много раз — декодируем его один раз,
+        # а все item'ы делят один QPixmap
+        by_path = {}
+        for item_id, x, y, path in rows:
+            by_path.setdefault(path, []).append((item_id, x, y))
+
+        for path, places in by_path.items():
+            pix = QPixmapCache.find(path)
+            if pix is not None:
+                for item_id, x, y in places:
+                    self._queue_item(item_id, x, y, pix)
+                continue
+            if path in self._awaiting:
+                self._awaiting[path].extend(places)
+                continue
+            self._awaiting[path] = places
+            task = DecodeTask(path)
+            task.signals.decoded.connect(self._on_decoded)
+            self._pool.start(task)
+
+    def _pixmap(self, path, image=None):
+        pix = QPixmapCache.find(path)
+        if pix is None:
+            pix = QPixmap.fromImage(image if image is not None else _load_image(path))
+            if not pix.isNull():
+                QPixmapCache.insert(path, pix)
+        return pix
+
+    def _on_decoded(self, path, image):
+        pix = self._pixmap(path, image)
+        for item_id, x, y in self._awaiting.pop(path, []):
+            self._queue_item(item_id, x, y, pix)
+
+    def _queue_item(self, item_id, x, y, pix):
+        if not self._pending_items:
+            QTimer.singleShot(0, self._flush_items)
+        self._pending_items.append((item_id, x, y, pix))
+
+    def _flush_items(self):
+        # всё, что успело прийти за проход цикла событий, — одной перерисовкой view
+        items, self._pending_items = self._pending_items, []
+        self.view.setUpdatesEnabled(False)
+        try:
+            for item_id, x, y, pix in items:
+                self._add_item(item_id, x, y, pix)
+        finally:
+            self.view.setUpdatesEnabled(True)
+        self.view.viewport().update()
+
+    def _add_item(self, item_id, x, y, pix):
+        if pix.isNull():
+            return
+        self.scene.addItem(DraggableImage(item_id, pix, x, y))
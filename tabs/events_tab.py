@@ -1,11 +1,17 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton,
-    QListWidget, QLineEdit
+    QListView, QLineEdit
 )
+from PySide6.QtCore import QThreadPool, Signal
 import db
+from tabs.query import QueryRunner
+from tabs.row_model import RowModel
 
 
 class EventsTab(QWidget):
+    # фоновая запись не прошла — строку, показанную заранее, убираем (из потока записи)
+    _write_failed = Signal(object)
+
     def __init__(self):
         super().__init__()
 
@@ -19,9 +25,15 @@ class EventsTab(QWidget):
         add_btn.clicked.connect(self.add_event)
         layout.addWidget(add_btn)
 
-        self.list_widget = QListWidget()
-        layout.addWidget(self.list_widget)
+        self.model = RowModel(lambda r: r["title"], self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        # строки одной высоты — view не меряет каждую
+        self.list_view.setUniformItemSizes(True)
+        layout.addWidget(self.list_view)
 
+        self._pool = QThreadPool(self)
+        self._write_failed.connect(self.model.remove_row)
         self.refresh()
 
     def add_event(self):
@@ -29,19 +41,16 @@ class EventsTab(QWidget):
         if not title:
             return
 
-        with db.get_conn() as conn:
-            conn.execute(
-                "INSERT INTO events(title) VALUES(?)",
-                (title,)
-            )
-
+        # запись только добавляется в конец — перечитывать всю таблицу незачем
+        row = {"id": None, "title": title}
+        self.model.append_row(row)
         self.title_input.clear()
-        self.refresh()
 
-    def refresh(self):
-        self.list_widget.clear()
-        with db.get_conn() as conn:
-            rows = conn.execute("SELECT id, title FROM events").fetchall()
+        # id строке списка не нужен — запись уходит в фон, GUI её не ждёт
+        fut = db.db_write_async("INSERT INTO events(title) VALUES(?)", (title,))
+        db.on_write_failed(fut, lambda: self._write_failed.emit(row))
 
-        for r in rows:
-            self.list_widget.addItem(r[1])
+    def refresh(self):
+        task = QueryRunner("SELECT id, title FROM events")
+        task.signals.finished.connect(self.model.set_rows)
+        self._pool.start(task)
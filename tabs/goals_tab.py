@@ -1,12 +1,17 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton,
-    QListWidget, QLineEdit, QSlider, QLabel
+    QListView, QLineEdit, QSlider, QLabel
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThreadPool, Signal
 import db
+from tabs.query import QueryRunner
+from tabs.row_model import RowModel
 
 
 class GoalsTab(QWidget):
+    # фоновая запись не прошла — строку, показанную заранее, убираем (из потока записи)
+    _write_failed = Signal(object)
+
     def __init__(self):
         super().__init__()
 
@@ -24,9 +29,15 @@ class GoalsTab(QWidget):
         add_btn.clicked.connect(self.add_goal)
         layout.addWidget(add_btn)
 
-        self.list_widget = QListWidget()
-        layout.addWidget(self.list_widget)
+        self.model = RowModel(lambda r: f"{r['title']} ({r['progress']}%)", self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        # строки одной высоты — view не меряет каждую
+        self.list_view.setUniformItemSizes(True)
+        layout.addWidget(self.list_view)
 
+        self._pool = QThreadPool(self)
+        self._write_failed.connect(self.model.remove_row)
         self.refresh()
 
     def add_goal(self):
@@ -34,19 +45,20 @@ class GoalsTab(QWidget):
         if not title:
             return
 
-        with db.get_conn() as conn:
-            conn.execute(
-                "INSERT INTO goals(title, progress) VALUES(?, ?)",
-                (title, self.progress_slider.value())
-            )
-
+        progress = self.progress_slider.value()
+        # запись только добавляется в конец — перечитывать всю таблицу незачем
+        row = {"id": None, "title": title, "progress": progress}
+        self.model.append_row(row)
         self.title_input.clear()
-        self.refresh()
 
-    def refresh(self):
-        self.list_widget.clear()
-        with db.get_conn() as conn:
-            rows = conn.execute("SELECT id, title, progress FROM goals").fetchall()
+        # id строке списка не нужен — запись уходит в фон, GUI её не ждёт
+        fut = db.db_write_async(
+            "INSERT INTO goals(title, progress) VALUES(?, ?)",
+            (title, progress)
+        )
+        db.on_write_failed(fut, lambda: self._write_failed.emit(row))
 
-        for r in rows:
-            self.list_widget.addItem(f"{r[1]} ({r[2]}%)")
+    def refresh(self):
+        task = QueryRunner("SELECT id, title, progress FROM goals")
+        task.signals.finished.connect(self.model.set_rows)
+        self._pool.start(task)
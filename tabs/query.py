@@ -0,0 +1,22 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+import db
+
+
+class _QuerySignals(QObject):
+    finished = Signal(list)
+
+
+class QueryRunner(QRunnable):
+    """
+    SELECT в пуле потоков: на холодном кэше чтение не подвешивает UI.
+    Строки приходят в GUI-поток сигналом finished.
+    """
+    def __init__(self, sql, params=()):
+        super().__init__()
+        self.sql = sql
+        self.params = params
+        self.signals = _QuerySignals()
+
+    def run(self):
+        rows = db.get_read_conn().execute(self.sql, self.params).fetchall()
+        self.signals.finished.emit(rows)
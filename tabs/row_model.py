@@ -0,0 +1,40 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class RowModel(QAbstractListModel):
+    """
+    Список строк из SQL для QListView: храним строки (sqlite3.Row) как есть,
+    текст собираем только для тех строк, которые view реально рисует.
+    """
+    def __init__(self, fmt, parent=None):
+        super().__init__(parent)
+        self._fmt = fmt  # (row) -> str
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self._fmt(self._rows[index.row()])
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def append_row(self, row):
+        n = len(self._rows)
+        self.beginInsertRows(QModelIndex(), n, n)
+        self._rows.append(row)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        # по identity: локально добавленные строки — dict без id
+        for n, r in enumerate(self._rows):
+            if r is row:
+                self.beginRemoveRows(QModelIndex(), n, n)
+                del self._rows[n]
+                self.endRemoveRows()
+                return
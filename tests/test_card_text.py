@@ -0,0 +1,43 @@
+import os
+import sys
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from PySide6.QtGui import QColor, QImage, QPainter
+from PySide6.QtWidgets import QApplication
+
+import app
+
+_APP = QApplication.instance() or QApplication([])
+
+
+def _text_lines(desc: str) -> int:
+    """Сколько строк текста описания реально нарисовано в chrome-картинке карточки."""
+    card = app.CardItem(None, app.CardData(title="T", desc=desc), w=300, h=190)
+    image = QImage(300, 190, QImage.Format_ARGB32)
+    image.fill(0)
+    painter = QPainter(image)
+    card._chrome_picture().play(painter)
+    painter.end()
+
+    # светлые строки пикселей в зоне описания; каждая непрерывная полоса — строка текста
+    rows = [
+        y for y in range(40, 150)
+        if any(QColor(image.pixel(x, y)).lightness() > 150 for x in range(14, 290))
+    ]
+    return sum(1 for i, y in enumerate(rows) if i == 0 or y != rows[i - 1] + 1)
+
+
+class CardTextTest(unittest.TestCase):
+    def test_single_line_description(self):
+        self.assertEqual(_text_lines("line1"), 1)
+
+    def test_multiline_description_keeps_line_breaks(self):
+        self.assertEqual(_text_lines("line1\nline2\nline3"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()